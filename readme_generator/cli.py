@@ -2,17 +2,205 @@ import os
 import re
 import json
 import click
+import codecs
 import openai
+import random
+import shelve
+import asyncio
 import hashlib
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import tiktoken
 except ImportError:
     tiktoken = None
 
+try:
+    import faiss
+    import numpy
+except ImportError:
+    faiss = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 MODEL_NAME = "gpt-4o"
+# gpt-4o rejects requests asking for more completion tokens than this
+MAX_COMPLETION_TOKENS = 16384
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = 1536
+
+# Fingerprinting algorithm for change detection. BLAKE2b is ~2-3x faster than
+# MD5 in hashlib; bumping this version invalidates previously stored digests.
+DIGEST_VERSION = "blake2b-16.2"
+
+# All system prompts share this byte-identical prefix (and user prompts put
+# static instructions before variable content) so the API's automatic
+# prompt-prefix caching applies across calls; only the task line varies.
+SYSTEM_PROMPT_PREFIX = (
+    "You are readme-generator's analysis assistant. You read source code, "
+    "partial summaries and project metadata in order to build README "
+    "documentation, and you always respond concisely. Task: "
+)
+
+
+def system_prompt_for(task):
+    return SYSTEM_PROMPT_PREFIX + task
+
+# Cap on simultaneous in-flight OpenAI requests (stays under typical RPM limits).
+MAX_CONCURRENT_REQUESTS = 8
+
+# Transient API failures (429s, timeouts, 5xx) are retried with exponential
+# backoff so a rate-limit blip doesn't write the error sentinel into the
+# README. The sentinel must never end up in any persistent cache.
+ERROR_RESPONSE = "(Error or empty response)"
+MAX_API_RETRIES = 6
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Threads used to read file contents during the repository scan. Reads release
+# the GIL, so this is close to free parallelism on a syscall-bound workload;
+# oversubscribing the CPU count keeps plenty of reads queued in the kernel,
+# which is what matters for small-file bulk I/O.
+SCAN_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# Files above this size are hashed in streamed blocks instead of being
+# materialized whole; 64 KiB blocks line up with typical SSD read-ahead.
+LARGE_FILE_THRESHOLD = 1024 * 1024
+STREAM_BLOCK_SIZE = 65536
+
+# A NUL byte in the first 8 KiB marks a file as binary before any full read or
+# decode happens. Files above 256 KiB are still fingerprinted (so changes in
+# them trigger regeneration) but are never sent for summarization -- minified
+# bundles and checked-in assets aren't worth the GPT tokens.
+BINARY_SNIFF_BYTES = 8192
+MAX_SUMMARY_FILE_SIZE = 262144
+
+# Responses are cached on disk so identical prompts (e.g. re-runs with --force,
+# or the static install-guide prompts) never hit the API twice.
+RESPONSE_CACHE_FILE = str(Path.home() / ".readme_gen_cache")
+
+# Near-duplicate chunks (license headers, shared boilerplate) are caught by a
+# semantic cache: chunk embeddings live in a FAISS index, cached summaries in a
+# parallel JSON list. Only active when faiss is installed.
+SEMANTIC_CACHE_INDEX_FILE = str(Path.home() / ".readme_gen_semantic.index")
+SEMANTIC_CACHE_SUMMARIES_FILE = str(Path.home() / ".readme_gen_semantic.json")
+
+_openai_client = None
+_request_semaphore = None
+_response_cache = None
+_semantic_index = None
+_semantic_summaries = None
+_semantic_dirty = False
+_encoder = None
+
+
+def get_encoder():
+    """
+    BPE encoder singleton. tiktoken.get_encoding walks the registry and may
+    load ~1.6 MB of ranks, so it must not run once per chunked file.
+    """
+    global _encoder
+    if _encoder is None:
+        if tiktoken is None:
+            _encoder = False
+        else:
+            try:
+                _encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                _encoder = False
+    return _encoder or None
+
+
+def load_semantic_cache():
+    global _semantic_index, _semantic_summaries
+    if faiss is None:
+        return None, None
+    if _semantic_index is None:
+        try:
+            _semantic_index = faiss.read_index(SEMANTIC_CACHE_INDEX_FILE)
+            _semantic_summaries = json.loads(
+                Path(SEMANTIC_CACHE_SUMMARIES_FILE).read_text(encoding="utf-8")
+            )
+        except Exception:
+            _semantic_index = faiss.IndexFlatIP(EMBEDDING_DIMENSIONS)
+            _semantic_summaries = []
+    return _semantic_index, _semantic_summaries
+
+
+def save_semantic_cache():
+    # Rewrites the whole index + summaries list, so callers persist once per
+    # run (see main_async) rather than after every stored chunk
+    global _semantic_dirty
+    if faiss is None or _semantic_index is None or not _semantic_dirty:
+        return
+    try:
+        faiss.write_index(_semantic_index, SEMANTIC_CACHE_INDEX_FILE)
+        Path(SEMANTIC_CACHE_SUMMARIES_FILE).write_text(
+            json.dumps(_semantic_summaries), encoding="utf-8"
+        )
+        _semantic_dirty = False
+    except Exception:
+        pass
+
+
+async def embed_text(text):
+    """
+    Embed 'text' and return an L2-normalized float32 row vector, so inner
+    product search over the FAISS index equals cosine similarity. Shares the
+    request semaphore and retry behavior of the chat calls; raises once
+    retries are exhausted.
+    """
+    last_error = None
+    for attempt in range(MAX_API_RETRIES):
+        try:
+            async with get_request_semaphore():
+                response = await get_openai_client().embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=text,
+                )
+        except (openai.RateLimitError, openai.APIConnectionError,
+                openai.APITimeoutError, openai.InternalServerError) as e:
+            last_error = e
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+            delay += random.uniform(0, delay / 2)
+            await asyncio.sleep(delay)
+            continue
+
+        vector = numpy.asarray(response.data[0].embedding, dtype="float32").reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    raise last_error
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        try:
+            _response_cache = shelve.open(RESPONSE_CACHE_FILE)
+        except Exception:
+            # Fall back to an in-memory dict if the cache file can't be opened
+            _response_cache = {}
+    return _response_cache
+
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.AsyncOpenAI()
+    return _openai_client
+
+
+def get_request_semaphore():
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return _request_semaphore
 
 ###############################################################################
 # Predefined installation guides
@@ -50,6 +238,17 @@ TOOL_INSTALL_GUIDES = {
     }
 }
 
+###############################################################################
+# Tool detection by file extension
+###############################################################################
+EXT_TO_TOOL = {
+    ".py": "Python",
+    ".tf": "Terraform",
+    ".sh": "Bash/Shell",
+    ".js": "Node.js / JavaScript",
+    ".ts": "TypeScript",
+}
+
 ###############################################################################
 # Default ignore patterns
 ###############################################################################
@@ -84,7 +283,10 @@ DEFAULT_IGNORE_PATTERNS = [
 @click.option("--ignore-ext", multiple=True,
               help="Ignore file extensions (e.g. '.png', '.exe'). Can be repeated.")
 @click.option("--digest-file", default="readme.md5s",
-              help="Where to store/load MD5 digests. Default: readme.md5s")
+              help="Where to store/load content digests. Default: readme.md5s")
+@click.option("--semantic-threshold", default=0.95,
+              help="Cosine similarity above which a cached chunk summary is reused "
+                   "(requires faiss; default: 0.95).")
 def main(directory,
          output_file,
          existing_readme_file,
@@ -96,7 +298,8 @@ def main(directory,
          force,
          ignore,
          ignore_ext,
-         digest_file):
+         digest_file,
+         semantic_threshold):
     """
     Analyzes the code in the specified directory (multi-step),
     merges with an existing README (if any), and uses a custom template file
@@ -112,74 +315,121 @@ def main(directory,
     - If an existing README is found, merges it into the final doc.
     - Also loads a user-provided template for extra sections or instructions.
     """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    if not openai.api_key:
+    if not os.getenv("OPENAI_API_KEY"):
         click.echo("Error: The environment variable OPENAI_API_KEY is not set.")
         return
 
+    asyncio.run(main_async(
+        directory=directory,
+        output_file=output_file,
+        existing_readme_file=existing_readme_file,
+        template_file=template_file,
+        append=append,
+        max_tokens=max_tokens,
+        dir_summary=dir_summary,
+        temperature=temperature,
+        force=force,
+        ignore=ignore,
+        ignore_ext=ignore_ext,
+        digest_file=digest_file,
+        semantic_threshold=semantic_threshold,
+    ))
+
+
+async def main_async(directory,
+                     output_file,
+                     existing_readme_file,
+                     template_file,
+                     append,
+                     max_tokens,
+                     dir_summary,
+                     temperature,
+                     force,
+                     ignore,
+                     ignore_ext,
+                     digest_file,
+                     semantic_threshold):
     # Combine default patterns + user-specified ignores
     ignore_patterns = list(DEFAULT_IGNORE_PATTERNS)
     if ignore:
         ignore_patterns.extend(ignore)
 
     # 1) Load old digests from separate file
-    old_repo_digest, old_dir_digests, old_file_digests = load_digests(digest_file)
+    old_repo_digest, old_dir_digests, old_file_digests, old_quick = load_digests(digest_file)
 
-    # 2) Compute new digests
-    new_file_digests = compute_file_digests(directory, ignore_patterns, ignore_ext)
-    new_dir_digests = compute_directory_digests(new_file_digests)
+    # 2) Cheap stat-only pre-check: if no file's (path, mtime, size) changed,
+    #    skip without reading a single file
+    new_quick = compute_quick_fingerprint(directory, ignore_patterns, ignore_ext)
+    if (not force) and (old_quick == new_quick) and (old_quick is not None):
+        click.echo("No code changes detected (quick fingerprint matches). Skipping README generation.")
+        return
+
+    # 3) Scan the tree once: digests, detected tools, and directory -> files map
+    new_file_digests, detected_tools, dir_to_files, digests_by_directory = scan_repository(
+        directory, ignore_patterns, ignore_ext
+    )
+    new_dir_digests = compute_directory_digests(digests_by_directory)
     new_repo_digest = compute_repo_digest_from_file_digests(new_file_digests)
 
-    # If no changes in entire repo => skip
+    # If no changes in entire repo => skip (mtimes moved but content didn't;
+    # refresh the stored quick fingerprint so the next run stops at the pre-check)
     if (not force) and (old_repo_digest == new_repo_digest) and (old_repo_digest is not None):
         click.echo("No code changes detected (repo digest matches). Skipping README generation.")
+        save_digests(digest_file, new_repo_digest, new_dir_digests, new_file_digests, new_quick)
         return
 
     # read optional repo.intro
     repo_intro = read_repo_intro(directory)
 
-    # detect Tools from file extensions (ignoring certain dirs if needed)
-    detected_tools = detect_tools(directory, ignore_patterns, ignore_ext)
-
-    # gather directories -> file paths
-    dir_to_files = gather_files_by_directory(directory, ignore_patterns, ignore_ext)
     if not dir_to_files and not repo_intro.strip():
         click.echo("No textual files found and no repo.intro content. Aborting.")
         return
 
-    # Summarize files
+    # Summarize files (changed files across all directories run concurrently,
+    # bounded by the shared request semaphore)
     click.echo("Summarizing files (multi-step) ...")
     directory_file_summaries = {}
     annotated_lines_map = defaultdict(list)
 
-    for dir_path, file_paths in dir_to_files.items():
+    changed_files = []
+    for dir_path, files in dir_to_files.items():
         file_summaries = {}
-        for fpath in file_paths:
+        for fpath, text in files.items():
             old_digest = old_file_digests.get(str(fpath), None)
             new_digest = new_file_digests.get(str(fpath), None)
 
             # skip if unchanged
             if not force and old_digest == new_digest and old_digest is not None:
                 click.echo(f" - No changes in {fpath}, skipping file summary.")
-                summary = "(Unchanged since last analysis)"
-                annotated_lines = []
+                file_summaries[fpath] = "(Unchanged since last analysis)"
             else:
-                summary, annotated_lines = summarize_file_and_collect_annotations(
-                    fpath,
-                    temperature=temperature
-                )
-                click.echo(f" - Summarized file {fpath}")
-
-            file_summaries[fpath] = summary
-            if annotated_lines:
-                annotated_lines_map[fpath].extend(annotated_lines)
+                file_summaries[fpath] = None  # filled in below
+                changed_files.append((dir_path, fpath, text))
 
         directory_file_summaries[dir_path] = file_summaries
 
+    file_tasks = [
+        summarize_file_and_collect_annotations(
+            text, temperature=temperature, semantic_threshold=semantic_threshold
+        )
+        for (_, _, text) in changed_files
+    ]
+    file_results = await asyncio.gather(*file_tasks)
+
+    for (dir_path, fpath, _), (summary, annotated_lines) in zip(changed_files, file_results):
+        click.echo(f" - Summarized file {fpath}")
+        directory_file_summaries[dir_path][fpath] = summary
+        if annotated_lines:
+            annotated_lines_map[fpath].extend(annotated_lines)
+
+    # All chunk summaries are in; persist the semantic cache in one write
+    save_semantic_cache()
+
     # Summarize directories (if enabled)
     click.echo("\nSummarizing directories ...")
     dir_summaries = {}
     if dir_summary:
+        changed_dirs = []
         for dir_path, file_summaries in directory_file_summaries.items():
             old_d_digest = old_dir_digests.get(str(dir_path), None)
             new_d_digest = new_dir_digests.get(str(dir_path), None)
@@ -188,9 +438,18 @@ def main(directory,
                 click.echo(f" - No changes in directory {dir_path}, skipping directory summary.")
                 dir_summaries[dir_path] = "(Unchanged since last analysis)"
             else:
-                ds = summarize_directory(dir_path, file_summaries, temperature=temperature)
-                dir_summaries[dir_path] = ds
-                click.echo(f" - Summarized directory {dir_path}")
+                dir_summaries[dir_path] = None  # filled in below
+                changed_dirs.append((dir_path, file_summaries))
+
+        dir_tasks = [
+            summarize_directory(dir_path, file_summaries, temperature=temperature)
+            for (dir_path, file_summaries) in changed_dirs
+        ]
+        dir_results = await asyncio.gather(*dir_tasks)
+
+        for (dir_path, _), ds in zip(changed_dirs, dir_results):
+            dir_summaries[dir_path] = ds
+            click.echo(f" - Summarized directory {dir_path}")
     else:
         dir_summaries = {}
 
@@ -219,7 +478,7 @@ def main(directory,
 
     # Summarize final repo + merge with existing README + template
     click.echo("\nGenerating final repo summary ...")
-    final_repo_readme = generate_final_readme(
+    final_repo_readme = await generate_final_readme(
         repo_intro=repo_intro,
         tools=detected_tools,
         directory_summaries=dir_summaries,
@@ -245,7 +504,7 @@ def main(directory,
     click.echo(f"\nREADME has been {'appended' if append else 'updated'} at: {output_file}")
 
     # 5) Save new digests to `digest_file`
-    save_digests(digest_file, new_repo_digest, new_dir_digests, new_file_digests)
+    save_digests(digest_file, new_repo_digest, new_dir_digests, new_file_digests, new_quick)
 
 
 ###############################################################################
@@ -254,96 +513,251 @@ def main(directory,
 
 def load_digests(digest_file):
     """
-    Load old_repo_digest, old_dir_digests, old_file_digests from a JSON file (digest_file).
-    If the file doesn't exist or is invalid, return (None, {}, {}).
+    Load old_repo_digest, old_dir_digests, old_file_digests and the stat-only
+    quick fingerprint from a JSON file (digest_file).
+    If the file doesn't exist or is invalid, return (None, {}, {}, None).
     Example JSON structure:
     {
       "repo_digest": "...",
+      "quick_fingerprint": "...",
       "directory_digests": { "path/to/dir": "...", ... },
       "file_digests": { "path/to/file": "...", ... }
     }
     """
     digest_path = Path(digest_file)
     if not digest_path.exists():
-        return None, {}, {}
+        return None, {}, {}, None
 
     try:
-        data = json.loads(digest_path.read_text(encoding="utf-8"))
+        raw = digest_path.read_bytes()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+        if data.get("digest_version") != DIGEST_VERSION:
+            # Digests written with a different algorithm can't be compared
+            return None, {}, {}, None
         return (
             data.get("repo_digest"),
             data.get("directory_digests", {}),
-            data.get("file_digests", {})
+            data.get("file_digests", {}),
+            data.get("quick_fingerprint")
         )
     except Exception:
-        return None, {}, {}
+        return None, {}, {}, None
 
-def save_digests(digest_file, repo_digest, directory_digests, file_digests):
+def save_digests(digest_file, repo_digest, directory_digests, file_digests,
+                 quick_fingerprint=None):
     """
-    Save the new repo_digest, directory_digests, file_digests to a JSON file (digest_file).
+    Save the new repo_digest, directory_digests, file_digests and quick
+    fingerprint to a JSON file (digest_file).
     """
     data = {
+        "digest_version": DIGEST_VERSION,
         "repo_digest": repo_digest,
+        "quick_fingerprint": quick_fingerprint,
         "directory_digests": directory_digests,
         "file_digests": file_digests
     }
-    Path(digest_file).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # Compact separators keep large digest maps small; writing to a temp file
+    # and renaming makes the update atomic, so a crash can't leave a
+    # half-written digest file behind. orjson serializes several times faster
+    # than json when available.
+    if orjson:
+        raw = orjson.dumps(data)
+    else:
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    tmp_path = Path(str(digest_file) + ".tmp")
+    tmp_path.write_bytes(raw)
+    os.replace(tmp_path, digest_file)
     click.echo(f"Saved new digests to {digest_file}")
 
 
 ###############################################################################
-# 2) Compute new digests
+# 2) Single-pass repository scan + digest computation
 ###############################################################################
 
-def compute_file_digests(directory, ignore_patterns, ignore_ext):
-    file_digests = {}
-    for root, dirs, files in os.walk(directory):
-        # skip if pattern is in 'root'
-        if any(ignored in root for ignored in ignore_patterns):
+def compile_ignore_patterns(ignore_patterns, ignore_ext):
+    """
+    One compiled alternation scans each path once instead of P separate
+    substring tests per path. Returns (ignore_re, ext_re); either may be None.
+    """
+    ignore_re = re.compile("|".join(re.escape(p) for p in ignore_patterns)) \
+        if ignore_patterns else None
+    ext_re = re.compile("(?:" + "|".join(re.escape(e) for e in ignore_ext) + ")$") \
+        if ignore_ext else None
+    return ignore_re, ext_re
+
+
+def iter_file_entries(dirpath, ignore_re):
+    """
+    Yield os.DirEntry objects for regular files under 'dirpath'. Uses
+    os.scandir so is_dir/is_file come from the stat cached by readdir (one
+    syscall per entry), and prunes ignored directories without descending.
+    """
+    try:
+        entries = os.scandir(dirpath)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if ignore_re and ignore_re.search(entry.path):
+                    continue
+                yield from iter_file_entries(entry.path, ignore_re)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def scan_repository(directory, ignore_patterns, ignore_ext):
+    """
+    Walk the tree exactly once, reading each file a single time, and feed the
+    three consumers in lockstep: per-file digests (for change detection),
+    detected tools (from file suffixes), and the directory -> files map used
+    for summarization. Returns (file_digests, tools, dir_to_files,
+    digests_by_directory): dir_to_files maps each directory to
+    {file_path: decoded text}, so summarization never re-reads from disk,
+    and digests_by_directory groups file digests under their parent
+    directory so compute_directory_digests needn't re-parse any paths.
+    """
+    ignore_re, ext_re = compile_ignore_patterns(ignore_patterns, ignore_ext)
+
+    candidates = []
+    for entry in iter_file_entries(directory, ignore_re):
+        file_name = entry.name
+        if ext_re and ext_re.search(file_name):
+            continue
+        if ignore_re and ignore_re.search(file_name):
             continue
 
-        for file_name in files:
-            if any(file_name.endswith(ext) for ext in ignore_ext):
-                continue
-            if any(ignored in file_name for ignored in ignore_patterns):
-                continue
+        if file_name == "repo.intro":
+            continue
 
-            if file_name == "repo.intro":
-                continue
+        try:
+            size = entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
+        candidates.append((entry.path, file_name, size))
+
+    def read_file(path, size):
+        """
+        Return the file's raw bytes, or -- for files above
+        LARGE_FILE_THRESHOLD -- a blake2b hash object already fed the content,
+        so the whole blob never lives in memory. Returns None for unreadable,
+        binary, or non-UTF-8 large files.
+        """
+        try:
+            with open(path, "rb") as f:
+                sniff = f.read(BINARY_SNIFF_BYTES)
+                if b"\x00" in sniff:
+                    # Binary; rejected before reading (or decoding) the rest
+                    return None
+                if size <= LARGE_FILE_THRESHOLD:
+                    return sniff + f.read()
+
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                file_hash = hashlib.blake2b(digest_size=16)
+                block = sniff
+                while block:
+                    file_hash.update(block)
+                    decoder.decode(block)  # raises on non-UTF-8 content
+                    block = f.read(STREAM_BLOCK_SIZE)
+            decoder.decode(b"", final=True)
+            return file_hash
+        except Exception:
+            return None
+
+    # Directory discovery is cheap; the reads dominate, so only they go to the
+    # pool. pool.map keeps results in input order, so output stays deterministic.
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        contents = pool.map(read_file,
+                            (path for path, _, _ in candidates),
+                            (size for _, _, size in candidates))
+
+    file_digests = {}
+    tools = set()
+    dir_map = defaultdict(dict)
+    digests_by_directory = defaultdict(list)
 
-            file_path = Path(root) / file_name
+    for (path, file_name, size), result in zip(candidates, contents):
+        if result is None:
+            continue
+
+        text = None
+        if isinstance(result, bytes):
+            # Only UTF-8 text files are summarizable; the decoded text is kept
+            # for the summarizer, the digest is fed the raw bytes directly.
             try:
-                content = file_path.read_text(encoding="utf-8")
-            except Exception:
+                text = result.decode("utf-8")
+            except UnicodeDecodeError:
                 continue
+            file_hash = hashlib.blake2b(digest_size=16)
+            file_hash.update(result)
+        else:
+            # Large file: already streamed through the hash in the worker
+            file_hash = result
+
+        file_path = Path(path)
+        parent = file_path.parent
+        rel_path = os.path.relpath(path, directory)
+        file_hash.update(rel_path.encode("utf-8", errors="ignore"))
+        digest = file_hash.hexdigest()
+        file_digests[str(file_path)] = digest
+        digests_by_directory[str(parent)].append(digest)
+
+        tool = EXT_TO_TOOL.get(os.path.splitext(file_name)[1])
+        if tool:
+            tools.add(tool)
+        elif file_name == "Dockerfile":
+            tools.add("Docker")
+
+        # Oversized files are fingerprinted above but never summarized
+        if size <= MAX_SUMMARY_FILE_SIZE and text is not None:
+            dir_map[parent][file_path] = text
+
+    return file_digests, tools, dict(dir_map), digests_by_directory
+
+def compute_quick_fingerprint(directory, ignore_patterns, ignore_ext):
+    """
+    Stat-only fingerprint of the tree: one hash over every candidate file's
+    (relative path, mtime_ns, size). No file contents are read, so this is a
+    fast pre-check that decides whether the full content scan is needed.
+    """
+    ignore_re, ext_re = compile_ignore_patterns(ignore_patterns, ignore_ext)
 
-            md5_hash = hashlib.md5()
-            md5_hash.update(content.encode("utf-8", errors="ignore"))
-            rel_path = os.path.relpath(str(file_path), directory)
-            md5_hash.update(rel_path.encode("utf-8", errors="ignore"))
+    entries = []
+    for entry in iter_file_entries(directory, ignore_re):
+        file_name = entry.name
+        if ext_re and ext_re.search(file_name):
+            continue
+        if ignore_re and ignore_re.search(file_name):
+            continue
+        if file_name == "repo.intro":
+            continue
 
-            file_digests[str(file_path)] = md5_hash.hexdigest()
-    return file_digests
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        rel_path = os.path.relpath(entry.path, directory)
+        entries.append(f"{rel_path}\0{st.st_mtime_ns}\0{st.st_size}")
 
-def compute_directory_digests(file_digests):
-    dir_map = defaultdict(list)
-    for fpath, fhash in file_digests.items():
-        dpath = str(Path(fpath).parent)
-        dir_map[dpath].append(fhash)
+    payload = "\n".join(sorted(entries)).encode("utf-8", errors="ignore")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
+
+def compute_directory_digests(digests_by_directory):
+    # One contiguous buffer per directory and a single update call, rather
+    # than one Python-level hashlib call per file digest
     dir_digests = {}
-    for dpath, hashes in dir_map.items():
-        md5_hash = hashlib.md5()
-        for h in sorted(hashes):
-            md5_hash.update(h.encode("utf-8"))
-        dir_digests[dpath] = md5_hash.hexdigest()
+    for dpath, hashes in digests_by_directory.items():
+        payload = b"\n".join(h.encode("utf-8") for h in sorted(hashes))
+        dir_digests[dpath] = hashlib.blake2b(payload, digest_size=16).hexdigest()
 
     return dir_digests
 
 def compute_repo_digest_from_file_digests(file_digests):
-    md5_hash = hashlib.md5()
-    for path, digest in sorted(file_digests.items()):
-        md5_hash.update(digest.encode("utf-8"))
-    return md5_hash.hexdigest()
+    payload = b"\n".join(
+        digest.encode("utf-8") for path, digest in sorted(file_digests.items())
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
 
 
 ###############################################################################
@@ -361,74 +775,92 @@ def read_repo_intro(directory):
 
 
 ###############################################################################
-# 4) detect_tools
-###############################################################################
-
-def detect_tools(directory, ignore_patterns, ignore_ext):
-    tools = set()
-    for root, dirs, files in os.walk(directory):
-        if any(ignored in root for ignored in ignore_patterns):
-            continue
-        for file_name in files:
-            if any(file_name.endswith(ext) for ext in ignore_ext):
-                continue
-            if any(ignored in file_name for ignored in ignore_patterns):
-                continue
-
-            if file_name.endswith(".py"):
-                tools.add("Python")
-            elif file_name.endswith(".tf"):
-                tools.add("Terraform")
-            elif file_name.endswith(".sh"):
-                tools.add("Bash/Shell")
-            elif file_name.endswith(".js"):
-                tools.add("Node.js / JavaScript")
-            elif file_name.endswith(".ts"):
-                tools.add("TypeScript")
-            elif file_name.endswith("Dockerfile"):
-                tools.add("Docker")
-    return tools
-
-
-###############################################################################
-# 5) gather_files_by_directory
+# Summarize files & collect !important
 ###############################################################################
 
-def gather_files_by_directory(directory, ignore_patterns, ignore_ext):
-    dir_map = defaultdict(list)
-    for root, dirs, files in os.walk(directory):
-        if any(ignored in root for ignored in ignore_patterns):
-            continue
-
-        for file_name in files:
-            if any(file_name.endswith(ext) for ext in ignore_ext):
-                continue
-            if any(ignored in file_name for ignored in ignore_patterns):
-                continue
-
-            if file_name == "repo.intro":
-                continue
+async def lookup_chunk_summary(chunk, semantic_threshold):
+    """
+    Consult the semantic cache for 'chunk'. Returns (summary, vector): the
+    summary of a semantically close chunk (or None on a miss), and the chunk's
+    embedding so a fresh summary can be stored later (or None without faiss).
+    """
+    index, summaries = load_semantic_cache()
+    if index is None:
+        return None, None
+    try:
+        vector = await embed_text(chunk)
+    except Exception:
+        return None, None
+    if index.ntotal > 0:
+        scores, ids = index.search(vector, 1)
+        if ids[0][0] >= 0 and scores[0][0] > semantic_threshold:
+            return summaries[ids[0][0]], vector
+    return None, vector
+
+
+def store_chunk_summary(vector, summary):
+    global _semantic_dirty
+    index, summaries = load_semantic_cache()
+    if index is None or vector is None:
+        return
+    # Failed or empty summaries must not be cached, or every later run would
+    # serve them for any similar chunk
+    if not summary or summary == ERROR_RESPONSE:
+        return
+    index.add(vector)
+    summaries.append(summary)
+    _semantic_dirty = True
 
-            file_path = Path(root) / file_name
-            try:
-                _ = file_path.read_text(encoding="utf-8")
-            except Exception:
-                continue
 
-            dir_map[Path(root)].append(file_path)
-    return dict(dir_map)
+async def summarize_chunks_batched(chunks, temperature):
+    """
+    Summarize all 'chunks' in a single request. The model returns JSON with
+    one summary per chunk plus a combined summary, eliminating the per-chunk
+    round trips. Returns (chunk_summaries, combined_summary), or (None, None)
+    if the response isn't usable JSON.
+    """
+    numbered_chunks = "\n\n".join(
+        f"[Chunk {idx+1}]\n{chunk}" for idx, chunk in enumerate(chunks)
+    )
+    raw = await call_openai_chat(
+        system_prompt=system_prompt_for(
+            "Summarize every chunk of the given file. Respond with JSON of the "
+            'form {"chunk_summaries": ["...", ...], "combined_summary": "..."} '
+            "containing one summary per chunk."
+        ),
+        user_prompt=(
+            f"Summarize each of the following {len(chunks)} chunks concisely, "
+            f"then combine them.\n\nFile chunks:\n\n{numbered_chunks}"
+        ),
+        max_tokens=min(MAX_COMPLETION_TOKENS, 300 * len(chunks) + 300),
+        temperature=temperature,
+        response_format={"type": "json_object"},
+    )
+    try:
+        data = json.loads(raw)
+        chunk_summaries = [str(s) for s in data["chunk_summaries"]]
+        combined_summary = str(data["combined_summary"])
+        if len(chunk_summaries) != len(chunks):
+            raise ValueError("chunk summary count mismatch")
+        return chunk_summaries, combined_summary
+    except Exception:
+        return None, None
 
 
-###############################################################################
-# Summarize files & collect !important
-###############################################################################
+async def summarize_single_chunk(chunk, idx, temperature):
+    return await call_openai_chat(
+        system_prompt=system_prompt_for("Summarize the given file content briefly."),
+        user_prompt=f"Summarize this file chunk concisely.\n\nFile chunk {idx+1}:\n\n{chunk}",
+        max_tokens=300,
+        temperature=temperature
+    )
 
-def summarize_file_and_collect_annotations(file_path, temperature=0.3):
-    try:
-        text = file_path.read_text(encoding="utf-8")
-    except Exception as e:
-        return (f"Could not read {file_path}: {e}", [])
 
+async def summarize_file_and_collect_annotations(text, temperature=0.3, semantic_threshold=0.95):
+    """
+    Summarize already-read file content; the scan hands the decoded text over
+    so no file is touched twice.
+    """
     annotated_lines = []
     lines = text.splitlines()
     for i, line in enumerate(lines, start=1):
@@ -436,42 +868,62 @@ def summarize_file_and_collect_annotations(file_path, temperature=0.3):
             annotated_lines.append((i, line.strip()))
 
     text_chunks = chunk_text(text, max_chunk_size=1200)
-    chunk_summaries = []
-    for idx, chunk in enumerate(text_chunks):
-        snippet_summary = call_openai_chat(
-            system_prompt="You are a code summarizer. Summarize the given file content briefly.",
-            user_prompt=f"File chunk {idx+1}:\n\n{chunk}\n\nSummarize it concisely.",
+
+    lookups = await asyncio.gather(*(
+        lookup_chunk_summary(chunk, semantic_threshold) for chunk in text_chunks
+    ))
+    chunk_summaries = [cached for cached, _ in lookups]
+    missing = [idx for idx, summary in enumerate(chunk_summaries) if summary is None]
+
+    combined_summary = None
+    if missing:
+        batch_summaries, batch_combined = await summarize_chunks_batched(
+            [text_chunks[idx] for idx in missing], temperature
+        )
+        if batch_summaries is None:
+            # Model didn't produce usable JSON; summarize the misses one by one
+            batch_summaries = await asyncio.gather(*(
+                summarize_single_chunk(text_chunks[idx], idx, temperature)
+                for idx in missing
+            ))
+        for idx, summary in zip(missing, batch_summaries):
+            chunk_summaries[idx] = summary
+            store_chunk_summary(lookups[idx][1], summary)
+        if batch_combined is not None and len(missing) == len(text_chunks):
+            # Nothing came from the cache, so the batched combined summary
+            # already covers the whole file
+            combined_summary = batch_combined
+
+    if combined_summary is None:
+        combined_text = "\n".join(
+            f"Chunk {idx+1} summary: {summary}"
+            for idx, summary in enumerate(chunk_summaries)
+        )
+        combined_summary = await call_openai_chat(
+            system_prompt=system_prompt_for("Combine partial summaries into one final summary."),
+            user_prompt=f"Combine these partial summaries into a single, concise summary:\n\n{combined_text}",
             max_tokens=300,
             temperature=temperature
         )
-        chunk_summaries.append(f"Chunk {idx+1} summary: {snippet_summary}")
-
-    combined_text = "\n".join(chunk_summaries)
-    final_file_summary = call_openai_chat(
-        system_prompt="You are a code summarizer. Combine partial summaries into one final summary.",
-        user_prompt=f"Combine these partial summaries into a single, concise summary:\n\n{combined_text}",
-        max_tokens=300,
-        temperature=temperature
-    )
-    return (final_file_summary, annotated_lines)
+    return (combined_summary, annotated_lines)
 
 
 ###############################################################################
 # Summarize directory
 ###############################################################################
 
-def summarize_directory(dir_path, file_summaries, temperature=0.3):
+async def summarize_directory(dir_path, file_summaries, temperature=0.3):
     summary_list = []
     for fpath, summary in file_summaries.items():
         summary_list.append(f"File: {fpath.name}\nSummary: {summary}\n")
 
     combined_file_summaries = "\n".join(summary_list)
-    dir_summary = call_openai_chat(
-        system_prompt="You are a code summarizer. Summarize a directory based on file summaries.",
+    dir_summary = await call_openai_chat(
+        system_prompt=system_prompt_for("Summarize a directory based on file summaries."),
         user_prompt=(
+            "Please provide a concise overview of this directory's purpose and logic.\n\n"
             f"Directory: {dir_path}\n\n"
-            f"Here are the file summaries:\n\n{combined_file_summaries}\n\n"
-            "Please provide a concise overview of this directory's purpose and logic."
+            f"Here are the file summaries:\n\n{combined_file_summaries}"
         ),
         max_tokens=500,
         temperature=temperature
@@ -483,7 +935,7 @@ def summarize_directory(dir_path, file_summaries, temperature=0.3):
 # Summarize entire repo => final README
 ###############################################################################
 
-def generate_final_readme(
+async def generate_final_readme(
     repo_intro,
     tools,
     directory_summaries,
@@ -513,13 +965,27 @@ def generate_final_readme(
     all_file_summaries = "\n".join(file_summary_list)
 
     # Summarize custom-annotated lines
-    annotated_summary = summarize_annotated_lines(annotated_lines_map, temperature=temperature)
+    annotated_summary = await summarize_annotated_lines(annotated_lines_map, temperature=temperature)
 
     # Tools instructions
-    tools_block = build_tools_install_instructions(sorted(tools), temperature=temperature)
+    tools_block = await build_tools_install_instructions(sorted(tools), temperature=temperature)
 
-    # The final prompt merges the existing README with the new analysis, plus a custom template
+    # The final prompt merges the existing README with the new analysis, plus a
+    # custom template. Static instructions lead, the stable-per-run template and
+    # existing README follow, and the fresh analysis comes last.
     user_prompt = f"""
+    **Your Task**:
+    - **Preserve** unique sections from the existing README.
+    - **Incorporate** the user-provided template headings.
+    - **Add** the new analysis (intro, tools, directory/file summaries, annotated code) into the final structure.
+
+    Preserve any unique sections from the original README and blend them with the
+    updated logic, tools, structure, and template. The final README should incorporate
+    the template's headings and instructions, plus the new analysis.
+
+    **Important**: Produce **valid Markdown** **without** enclosing the entire output in triple backticks.
+    Keep it under {max_tokens} tokens if possible, and be concise yet informative.
+
     We have a user-provided template (or custom instructions):
     {template_content}
 
@@ -544,22 +1010,10 @@ def generate_final_readme(
     {annotated_summary}
 
     Code Digest: {repo_digest or ''}
-
-    **Your Task**:
-    - **Preserve** unique sections from the existing README.
-    - **Incorporate** the user-provided template headings.
-    - **Add** the new analysis (intro, tools, directory/file summaries, annotated code) into the final structure.
-
-    Preserve any unique sections from the original README and blend them with the
-    updated logic, tools, structure, and template. The final README should incorporate
-    the template's headings and instructions, plus the new analysis.
-
-    **Important**: Produce **valid Markdown** **without** enclosing the entire output in triple backticks.
-    Keep it under {max_tokens} tokens if possible, and be concise yet informative.
     """
 
-    final_readme = call_openai_chat(
-        system_prompt="You are a helpful assistant that merges existing content, a template, and new analysis.",
+    final_readme = await call_openai_chat(
+        system_prompt=system_prompt_for("Merge existing content, a template, and new analysis."),
         user_prompt=user_prompt,
         max_tokens=max_tokens,
         temperature=temperature
@@ -579,7 +1033,7 @@ def generate_final_readme(
 # Summarize annotated lines
 ###############################################################################
 
-def summarize_annotated_lines(annotated_lines_map, temperature=0.3):
+async def summarize_annotated_lines(annotated_lines_map, temperature=0.3):
     if not annotated_lines_map:
         return "No custom annotations found."
 
@@ -591,8 +1045,8 @@ def summarize_annotated_lines(annotated_lines_map, temperature=0.3):
         lines_text.append(f"File: {fp}\n{line_block}\n")
 
     combined_text = "\n".join(lines_text)
-    annotated_summary = call_openai_chat(
-        system_prompt="You are analyzing custom annotated lines in the code.",
+    annotated_summary = await call_openai_chat(
+        system_prompt=system_prompt_for("Analyze custom annotated lines in the code."),
         user_prompt=(
             "Below are lines containing '!important' with file paths and line numbers. "
             "Please summarize what they indicate about the code:\n\n"
@@ -608,7 +1062,7 @@ def summarize_annotated_lines(annotated_lines_map, temperature=0.3):
 # Tools Installation
 ###############################################################################
 
-def build_tools_install_instructions(tools_list, temperature=0.3):
+async def build_tools_install_instructions(tools_list, temperature=0.3):
     """
     Build installation instructions for each tool.
     If a tool is in TOOL_INSTALL_GUIDES, use that data.
@@ -633,20 +1087,20 @@ def build_tools_install_instructions(tools_list, temperature=0.3):
             lines.append(f"**Ubuntu**: {ubuntu}\n")
         else:
             # Unknown tool => generate instructions on the fly
-            instructions = generate_install_guide_for(tool, temperature=temperature)
+            instructions = await generate_install_guide_for(tool, temperature=temperature)
             lines.append(instructions)
             lines.append("")  # blank line
 
     return "\n".join(lines)
 
 
-def generate_install_guide_for(tool_name, temperature=0.3):
+async def generate_install_guide_for(tool_name, temperature=0.3):
     """
     Use GPT to produce short installation instructions for 'tool_name'
     on Windows, Mac, and Ubuntu. We'll do a single call.
     """
-    system_prompt = (
-        "You are a helpful assistant that provides brief, step-by-step installation instructions "
+    system_prompt = system_prompt_for(
+        "Provide brief, step-by-step installation instructions "
         "for different tools on Windows, Mac, and Ubuntu."
     )
     user_prompt = (
@@ -654,7 +1108,7 @@ def generate_install_guide_for(tool_name, temperature=0.3):
         "on Windows, Mac, and Ubuntu. Keep it short and clear."
     )
 
-    response = call_openai_chat(
+    response = await call_openai_chat(
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         max_tokens=300,
@@ -667,50 +1121,103 @@ def generate_install_guide_for(tool_name, temperature=0.3):
 # OpenAI call with usage logging
 ###############################################################################
 
-def call_openai_chat(system_prompt, user_prompt, max_tokens=500, temperature=0.3):
+async def call_openai_chat(system_prompt, user_prompt, max_tokens=500, temperature=0.3,
+                           response_format=None):
+    cache = get_response_cache()
+    cache_key = hashlib.sha256(
+        json.dumps(
+            [MODEL_NAME, system_prompt, user_prompt, temperature, max_tokens, response_format]
+        ).encode("utf-8")
+    ).hexdigest()
+    if cache_key in cache:
+        return cache[cache_key]
+
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
-    try:
-        response = openai.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=temperature,
-        )
-        usage = response.usage
-        prompt_tokens = usage.prompt_tokens
-        completion_tokens = usage.completion_tokens
-        total_tokens = prompt_tokens + completion_tokens
+    extra_kwargs = {}
+    if response_format is not None:
+        extra_kwargs["response_format"] = response_format
+
+    last_error = None
+    for attempt in range(MAX_API_RETRIES):
+        try:
+            async with get_request_semaphore():
+                response = await get_openai_client().chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **extra_kwargs,
+                )
+        except (openai.RateLimitError, openai.APIConnectionError,
+                openai.APITimeoutError, openai.InternalServerError) as e:
+            last_error = e
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt))
+            # Honor the server's Retry-After when the 429/5xx carries one
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            if headers is not None:
+                try:
+                    delay = max(delay, float(headers.get("retry-after")))
+                except (TypeError, ValueError):
+                    pass
+            # Jitter so concurrent tasks don't retry in lockstep
+            delay += random.uniform(0, delay / 2)
+            click.echo(
+                f" - OpenAI API {type(e).__name__}; retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{MAX_API_RETRIES})."
+            )
+            await asyncio.sleep(delay)
+            continue
+        except Exception as e:
+            click.echo("Error calling OpenAI API:")
+            click.echo(str(e))
+            return ERROR_RESPONSE
 
-        click.echo(f" - API call used {prompt_tokens} prompt + {completion_tokens} completion = {total_tokens} total tokens.")
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        click.echo("Error calling OpenAI API:")
-        click.echo(str(e))
-        return "(Error or empty response)"
+        usage = response.usage
+        if usage is not None:
+            prompt_tokens = usage.prompt_tokens
+            completion_tokens = usage.completion_tokens
+            total_tokens = prompt_tokens + completion_tokens
+
+            click.echo(f" - API call used {prompt_tokens} prompt + {completion_tokens} completion = {total_tokens} total tokens.")
+        # content is None for content-filter/refusal responses; such empty
+        # results stay uncached so a transient refusal can't pin itself
+        content = (response.choices[0].message.content or "").strip()
+        if content:
+            cache[cache_key] = content
+            if hasattr(cache, "sync"):
+                cache.sync()
+        return content
+
+    click.echo("Error calling OpenAI API (retries exhausted):")
+    click.echo(str(last_error))
+    return ERROR_RESPONSE
 
 
 ###############################################################################
 # Text Chunking
 ###############################################################################
 
-def chunk_text(text, max_chunk_size=1200):
-    if not tiktoken:
-        chunk_len = max_chunk_size * 2
-        return [text[i : i+chunk_len] for i in range(0, len(text), chunk_len)]
+def chunk_text(text, max_chunk_size=1200, precise=False):
+    # ~4 chars per token is close enough for summary chunking, and character
+    # slicing is orders of magnitude cheaper than a full BPE encode. The
+    # encoder is only consulted in precise mode or when the estimate lands
+    # within 10% of the chunk limit, where the heuristic could misjudge
+    # whether the text still fits in one chunk.
+    chunk_len = max_chunk_size * 4
+    estimated_tokens = len(text) / 4
+    near_limit = abs(estimated_tokens - max_chunk_size) <= max_chunk_size * 0.1
 
     # We just pick a known encoding, ignoring MODEL_NAME
-    enc = tiktoken.get_encoding("cl100k_base")
-    tokens = enc.encode(text)
+    enc = get_encoder() if (precise or near_limit) else None
+    if not enc:
+        return [text[i : i+chunk_len] for i in range(0, len(text), chunk_len)]
 
-    chunks = []
-    start = 0
-    while start < len(tokens):
-        end = start + max_chunk_size
-        token_chunk = tokens[start:end]
-        chunk_text_ = enc.decode(token_chunk)
-        chunks.append(chunk_text_)
-        start = end
-    return chunks
+    tokens = enc.encode(text)
+    # decode_batch handles all slices in one native call
+    return enc.decode_batch(
+        [tokens[start : start + max_chunk_size]
+         for start in range(0, len(tokens), max_chunk_size)]
+    )
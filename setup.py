@@ -6,9 +6,9 @@ setup(
     version="0.1.0",
     packages=find_packages(),
     install_requires=[
-        "openai",
+        "openai>=1.0",
         "click",
-        "tiktoken",
+        "tiktoken>=0.5",
     ],
     entry_points={
         "console_scripts": [